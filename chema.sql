@@ -4,14 +4,159 @@ CREATE TABLE IF NOT EXISTS nodes (
     node_label TEXT
 );
 
+-- Distinct (relation, relation_label) pairs; edges refer to them by id instead of
+-- repeating both strings on every row
+CREATE TABLE IF NOT EXISTS relations (
+    relation_id SERIAL PRIMARY KEY,
+    relation TEXT,
+    relation_label TEXT,
+    UNIQUE (relation, relation_label)
+);
+
 CREATE TABLE IF NOT EXISTS edges (
-    edge_id INTEGER PRIMARY KEY,
+    edge_id BIGINT PRIMARY KEY,
     node1_id TEXT REFERENCES nodes(node_id) ON DELETE CASCADE,
     node2_id TEXT REFERENCES nodes(node_id) ON DELETE CASCADE,
-    relation TEXT,
-    relation_label TEXT
+    relation_id INTEGER REFERENCES relations(relation_id)
 );
 
+-- Move databases created before the relations table to it: fill relations from the
+-- edge strings, point every edge at its row and drop the strings (with the old indexes
+-- and edges_undirected, which are re-created below). edges_undirected and its sync trigger
+-- go first, so rewriting every edge doesn't also rewrite both of its mirror rows
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'edges' AND column_name = 'relation') THEN
+        DROP TRIGGER IF EXISTS edges_undirected_sync ON edges;
+        DROP TRIGGER IF EXISTS edges_undirected_truncate ON edges;
+        DROP TABLE IF EXISTS edges_undirected;
+        INSERT INTO relations (relation, relation_label)
+        SELECT DISTINCT relation, relation_label FROM edges
+        ON CONFLICT DO NOTHING;
+        ALTER TABLE edges ADD COLUMN relation_id INTEGER REFERENCES relations(relation_id);
+        UPDATE edges e SET relation_id = r.relation_id
+        FROM relations r
+        WHERE r.relation IS NOT DISTINCT FROM e.relation
+          AND r.relation_label IS NOT DISTINCT FROM e.relation_label;
+        ALTER TABLE edges DROP COLUMN relation, DROP COLUMN relation_label;
+    END IF;
+END $$;
+
+-- Edge ids are byte offsets of the lines in the imported TSV, which outgrow INTEGER;
+-- widens databases created before that (a no-op once the column is BIGINT)
+ALTER TABLE edges ALTER COLUMN edge_id TYPE BIGINT;
+
 CREATE INDEX IF NOT EXISTS node1_idx ON edges (node1_id);
 CREATE INDEX IF NOT EXISTS node2_idx ON edges (node2_id);
-CREATE INDEX IF NOT EXISTS node_idx ON nodes (node_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS node_idx ON nodes (node_id);
+
+-- The relation-filtered traversals (goals 16-18) read edges_undirected's (src, relation_id)
+-- index, so the old (relation_id, endpoint) indexes on edges no longer serve any query
+DROP INDEX IF EXISTS edges_rel_n1, edges_rel_n2;
+
+-- Outgoing edges of every node as {relation: [target, ...]}, filled in by import_data.py.
+-- The jsonb_path_ops GIN index answers "which nodes share this (relation, child)" (goal 15).
+ALTER TABLE nodes ADD COLUMN IF NOT EXISTS out_rels JSONB;
+
+-- Fill out_rels if edges was loaded before the column existed (no-op once any node has it)
+UPDATE nodes n SET out_rels = o.rels
+FROM (
+    SELECT node1_id, jsonb_object_agg(relation, targets) AS rels
+    FROM (
+        SELECT e.node1_id, r.relation, jsonb_agg(DISTINCT e.node2_id) AS targets
+        FROM edges e
+        JOIN relations r ON r.relation_id = e.relation_id
+        WHERE r.relation IS NOT NULL
+        GROUP BY e.node1_id, r.relation
+    ) t
+    GROUP BY node1_id
+) o
+WHERE o.node1_id = n.node_id
+  AND NOT EXISTS (SELECT 1 FROM nodes WHERE out_rels IS NOT NULL);
+
+CREATE INDEX IF NOT EXISTS nodes_out_rels_gin ON nodes USING gin (out_rels jsonb_path_ops);
+
+-- Both directions of every edge (src -> dst and dst -> src), so undirected neighbour
+-- lookups (goals 5, 6, 16-18) are one (src, relation_id) range scan instead of a UNION of
+-- node1_id/node2_id scans. Kept in sync with edges by the triggers below; import_data.py
+-- disables the row trigger during a load and rebuilds the table in bulk afterwards.
+CREATE TABLE IF NOT EXISTS edges_undirected (
+    edge_id BIGINT NOT NULL,
+    src TEXT,
+    dst TEXT,
+    relation_id INTEGER
+);
+
+ALTER TABLE edges_undirected ALTER COLUMN edge_id TYPE BIGINT;
+
+CREATE INDEX IF NOT EXISTS edges_undirected_src_rel ON edges_undirected (src, relation_id);
+CREATE INDEX IF NOT EXISTS edges_undirected_edge ON edges_undirected (edge_id);
+
+CREATE OR REPLACE FUNCTION edges_undirected_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM edges_undirected WHERE edge_id = OLD.edge_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO edges_undirected (edge_id, src, dst, relation_id)
+        VALUES (NEW.edge_id, NEW.node1_id, NEW.node2_id, NEW.relation_id),
+               (NEW.edge_id, NEW.node2_id, NEW.node1_id, NEW.relation_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION edges_undirected_truncate() RETURNS trigger AS $$
+BEGIN
+    TRUNCATE edges_undirected;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS edges_undirected_sync ON edges;
+CREATE TRIGGER edges_undirected_sync
+    AFTER INSERT OR UPDATE OR DELETE ON edges
+    FOR EACH ROW EXECUTE FUNCTION edges_undirected_sync();
+
+DROP TRIGGER IF EXISTS edges_undirected_truncate ON edges;
+CREATE TRIGGER edges_undirected_truncate
+    AFTER TRUNCATE ON edges
+    FOR EACH STATEMENT EXECUTE FUNCTION edges_undirected_truncate();
+
+-- Fill edges_undirected if edges was loaded before it existed (no-op otherwise)
+INSERT INTO edges_undirected (edge_id, src, dst, relation_id)
+SELECT edge_id, node1_id, node2_id, relation_id FROM edges
+WHERE NOT EXISTS (SELECT 1 FROM edges_undirected)
+UNION ALL
+SELECT edge_id, node2_id, node1_id, relation_id FROM edges
+WHERE NOT EXISTS (SELECT 1 FROM edges_undirected);
+
+-- Degree of every node (distinct successors + distinct predecessors) for goal 12.
+-- A plain table rather than a materialized view, so a rename (goal 14) can move its row in
+-- the same transaction; import_data.py recomputes it after every load. Databases created
+-- with the materialized view are switched over here.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_matviews WHERE matviewname = 'node_degrees') THEN
+        DROP MATERIALIZED VIEW node_degrees;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS node_degrees (
+    node_id TEXT PRIMARY KEY,
+    node_label TEXT,
+    degree BIGINT NOT NULL
+);
+
+-- Fill node_degrees if edges was loaded before it existed (no-op otherwise)
+INSERT INTO node_degrees (node_id, node_label, degree)
+SELECT n.node_id, n.node_label, COALESCE(o.cnt, 0) + COALESCE(i.cnt, 0)
+FROM nodes n
+LEFT JOIN (SELECT node1_id, COUNT(DISTINCT node2_id) AS cnt FROM edges GROUP BY node1_id) o
+    ON o.node1_id = n.node_id
+LEFT JOIN (SELECT node2_id, COUNT(DISTINCT node1_id) AS cnt FROM edges GROUP BY node2_id) i
+    ON i.node2_id = n.node_id
+WHERE NOT EXISTS (SELECT 1 FROM node_degrees);
+
+CREATE INDEX IF NOT EXISTS node_degrees_degree_idx ON node_degrees (degree DESC);
@@ -5,19 +5,56 @@ A comprehensive command-line interface for querying and managing a CSKG (CommonS
 Supports 18 different operations on nodes and edges in the knowledge graph.
 """
 
-import psycopg2
+import psycopg
 import argparse
+import shlex
 import time
-from psycopg2 import Error
+from collections import OrderedDict
+from contextlib import nullcontext
+from psycopg import Error
+from psycopg_pool import ConnectionPool
 
-# Dictionary containing all SQL queries with their corresponding numbers
+# Connection settings shared by every pooled connection
+DB_PARAMS = {
+    "dbname": "Projects2025",
+    "user": "postgres",
+    "password": "postgres",
+    "host": "localhost",
+    "connect_timeout": 10,
+    # Read-only goals run without BEGIN/COMMIT; the rename opens its own transaction
+    "autocommit": True,
+    # Prepare a statement server-side from its second execution on a connection
+    "prepare_threshold": 1,
+}
+
+# Process-wide connection pool, created on first use so that --help never connects
+_pool = None
+
+# Node labels already fetched by this process, least recently used first
+LABEL_CACHE_SIZE = 10000
+_label_cache = OrderedDict()
+
+# Relations followed by the distant synonym/antonym queries (17-18), bound as one text[]
+SYNONYM_RELATIONS = ["/r/Synonym", "/r/Antonym"]
+
+# Planner's row estimate for nodes (goal 9 with --approx); -1 until the table has been
+# analyzed (0 before PostgreSQL 14)
+APPROX_NODE_COUNT = "SELECT reltuples::bigint FROM pg_class WHERE oid = 'nodes'::regclass"
+
+# Rows fetched per round trip when streaming multi-row results
+STREAM_BATCH_SIZE = 1000
+
+# Dictionary containing all SQL queries with their corresponding numbers.
+# Single-statement queries are executed with prepare=True, so each one is parsed and
+# planned once per pooled connection and re-executed by name afterwards.
 QUERIES = {
     # Query 1: Find all successors of a given node (nodes it points to)
     1: """
         SELECT DISTINCT e.node2_id, n.node_label, 
-               STRING_AGG(DISTINCT e.relation, ', ' ORDER BY e.relation) AS relations,
-               STRING_AGG(DISTINCT e.relation_label, ', ' ORDER BY e.relation_label) AS relation_labels
+               array_agg(DISTINCT r.relation ORDER BY r.relation) AS relations,
+               array_agg(DISTINCT r.relation_label ORDER BY r.relation_label) AS relation_labels
         FROM edges e
+        JOIN relations r ON r.relation_id = e.relation_id
         JOIN nodes n ON e.node2_id = n.node_id
         WHERE e.node1_id = %s
         GROUP BY e.node2_id, n.node_label
@@ -30,11 +67,12 @@ QUERIES = {
     # Query 3: Find all predecessors of a given node (nodes that point to it)
     3: """
         SELECT 
-        STRING_AGG(DISTINCT e.node1_id, ', ' ORDER BY e.node1_id) AS node_ids,  -- Agreguj wszystkie node_id
+        array_agg(DISTINCT e.node1_id ORDER BY e.node1_id) AS node_ids,  -- Agreguj wszystkie node_id
         n.node_label,
-        STRING_AGG(DISTINCT e.relation, ', ' ORDER BY e.relation) AS relations,
-        STRING_AGG(DISTINCT e.relation_label, ', ' ORDER BY e.relation_label) AS relation_labels
+        array_agg(DISTINCT r.relation ORDER BY r.relation) AS relations,
+        array_agg(DISTINCT r.relation_label ORDER BY r.relation_label) AS relation_labels
     FROM edges e
+    JOIN relations r ON r.relation_id = e.relation_id
     JOIN nodes n ON e.node1_id = n.node_id
     WHERE e.node2_id = %s
     GROUP BY n.node_label  -- Grupowanie tylko po etykiecie
@@ -47,35 +85,28 @@ QUERIES = {
     # Query 5: Find all neighbors of a given node (both successors and predecessors)
     5: """
         SELECT 
-    STRING_AGG(DISTINCT e.node_id, ', ') AS nodes,  -- agreguj wszystkie node_id
+    array_agg(DISTINCT e.dst ORDER BY e.dst) AS nodes,  -- agreguj wszystkie node_id
     n.node_label,
-    STRING_AGG(DISTINCT e.relation, ', ') AS relations,
-    STRING_AGG(DISTINCT e.relation_label, ', ') AS relation_types
-FROM (
-    SELECT node2_id AS node_id, relation, relation_label FROM edges WHERE node1_id = %s
-    UNION
-    SELECT node1_id AS node_id, relation, relation_label FROM edges WHERE node2_id = %s
-) e
-JOIN nodes n ON e.node_id = n.node_id
+    array_agg(DISTINCT r.relation ORDER BY r.relation) AS relations,
+    array_agg(DISTINCT r.relation_label ORDER BY r.relation_label) AS relation_types
+FROM edges_undirected e
+JOIN relations r ON r.relation_id = e.relation_id
+JOIN nodes n ON e.dst = n.node_id
+WHERE e.src = %s
 GROUP BY n.node_label
     """,
     
     # Query 6: Count all unique neighbors of a given node
-    6: """
-        SELECT COUNT(*) FROM (
-            SELECT node2_id FROM edges WHERE node1_id = %s
-            UNION
-            SELECT node1_id FROM edges WHERE node2_id = %s
-        ) t
-    """,
+    6: "SELECT COUNT(DISTINCT dst) FROM edges_undirected WHERE src = %s",
     
     # Query 7: Find successors of successors (2-hop forward connections)
     7: """
         WITH successors AS (
             SELECT node2_id FROM edges WHERE node1_id = %s
         )
-        SELECT e.node2_id, n.node_label, e.relation_label
+        SELECT e.node2_id, n.node_label, r.relation_label
         FROM edges e
+        JOIN relations r ON r.relation_id = e.relation_id
         JOIN nodes n ON e.node2_id = n.node_id
         WHERE e.node1_id IN (SELECT node2_id FROM successors)
     """,
@@ -85,8 +116,9 @@ GROUP BY n.node_label
         WITH predecessors AS (
             SELECT node1_id FROM edges WHERE node2_id = %s
         )
-        SELECT e.node1_id, n.node_label, e.relation_label
+        SELECT e.node1_id, n.node_label, r.relation_label
         FROM edges e
+        JOIN relations r ON r.relation_id = e.relation_id
         JOIN nodes n ON e.node1_id = n.node_id
         WHERE e.node2_id IN (SELECT node1_id FROM predecessors)
     """,
@@ -116,17 +148,13 @@ GROUP BY n.node_label
         ) t
     """,
     
-    # Query 12: Find the most connected node(s) (with highest degree)
-    12: """WITH out_degrees AS (
-          SELECT node1_id AS node_id, COUNT(DISTINCT node2_id) AS out_degree
-          FROM edges
-          GROUP BY node1_id
-       )
-       SELECT n.node_id, n.node_label, d.out_degree 
-       FROM out_degrees d
-       JOIN nodes n ON n.node_id = d.node_id
-       WHERE d.out_degree = (SELECT MAX(out_degree) FROM out_degrees)
-       ORDER BY n.node_id""",
+    # Query 12: Find the most connected node(s) (with highest degree), using the precomputed node_degrees table
+    12: """
+        SELECT node_id, node_label, degree
+        FROM node_degrees
+        WHERE degree = (SELECT MAX(degree) FROM node_degrees)
+        ORDER BY node_id
+    """,
 
     # Query 13: Count nodes with exactly one connection (degree = 1)
     13: """WITH all_neighbors AS (
@@ -139,120 +167,110 @@ GROUP BY n.node_label
            )
            SELECT COUNT(*) FROM counts WHERE cnt = 1""",
 
-    # Query 14: Rename a node (update all references in both nodes and edges)
-    14: """
-        BEGIN;
-        
-        INSERT INTO nodes (node_id, node_label) VALUES (%s, %s);
-        
-        UPDATE edges SET node1_id = %s WHERE node1_id = %s;
-        UPDATE edges SET node2_id = %s WHERE node2_id = %s;
-        
-        DELETE FROM nodes WHERE node_id = %s;
-        COMMIT;
-    """,
+    # Query 14: Rename a node (update all references in both nodes and edges).
+    # The statements are run one by one inside a single transaction by run_query.
+    14: (
+        "INSERT INTO nodes (node_id, node_label) VALUES (%s, %s)",
+        "UPDATE edges SET node1_id = %s WHERE node1_id = %s",
+        "UPDATE edges SET node2_id = %s WHERE node2_id = %s",
+        # Rebuild out_rels of the renamed node and of every node pointing at it
+        """
+        UPDATE nodes n SET out_rels = (
+            SELECT jsonb_object_agg(t.relation, t.targets)
+            FROM (
+                SELECT r.relation, jsonb_agg(DISTINCT e.node2_id) AS targets
+                FROM edges e
+                JOIN relations r ON r.relation_id = e.relation_id
+                WHERE e.node1_id = n.node_id AND r.relation IS NOT NULL
+                GROUP BY r.relation
+            ) t
+        )
+        WHERE n.node_id = %s OR n.node_id IN (SELECT node1_id FROM edges WHERE node2_id = %s)
+        """,
+        # A rename keeps every degree, so only the renamed node's row moves
+        "UPDATE node_degrees SET node_id = %s, node_label = %s WHERE node_id = %s",
+        "DELETE FROM nodes WHERE node_id = %s",
+    ),
     
     # Query 15: Find all "similar" nodes - those sharing a common parent or child by same edge type
     15: """
         WITH common_parents AS (
-        SELECT 
+        SELECT DISTINCT
             e2.node2_id AS similar_node, 
             'common_parent' AS similarity_type,
-            STRING_AGG(DISTINCT e1.relation, ' | ' ORDER BY e1.relation) AS relation_types
+            r1.relation
         FROM edges e1
-        JOIN edges e2 ON e1.node1_id = e2.node1_id AND e1.relation = e2.relation
+        JOIN relations r1 ON r1.relation_id = e1.relation_id
+        JOIN edges e2 ON e1.node1_id = e2.node1_id
+        JOIN relations r2 ON r2.relation_id = e2.relation_id AND r2.relation = r1.relation
         WHERE e1.node2_id = %s AND e2.node2_id != %s
-        GROUP BY e2.node2_id
     ),
     common_children AS (
-        SELECT 
-            e2.node1_id AS similar_node, 
+        -- Nodes whose out_rels contain one of the target's (relation, child) pairs,
+        -- looked up through the jsonb_path_ops GIN index instead of an edges self-join
+        SELECT DISTINCT
+            n2.node_id AS similar_node, 
             'common_child' AS similarity_type,
-            STRING_AGG(DISTINCT e1.relation, ' | ' ORDER BY e1.relation) AS relation_types
+            r1.relation
         FROM edges e1
-        JOIN edges e2 ON e1.node2_id = e2.node2_id AND e1.relation = e2.relation
-        WHERE e1.node1_id = %s AND e2.node1_id != %s
-        GROUP BY e2.node1_id
+        JOIN relations r1 ON r1.relation_id = e1.relation_id
+        JOIN nodes n2 ON n2.out_rels @> jsonb_build_object(r1.relation, jsonb_build_array(e1.node2_id))
+        WHERE e1.node1_id = %s AND n2.node_id != %s AND r1.relation IS NOT NULL
     )
     SELECT 
         n.node_id,
         n.node_label,
-        STRING_AGG(DISTINCT sim.similarity_type, ' | ' ORDER BY sim.similarity_type) AS similarity_types,
-        STRING_AGG(DISTINCT sim.relation_types, ' | ') AS relations
+        array_agg(DISTINCT sim.similarity_type ORDER BY sim.similarity_type) AS similarity_types,
+        array_agg(DISTINCT sim.relation ORDER BY sim.relation) AS relations
     FROM (
-        SELECT similar_node, similarity_type, relation_types FROM common_parents
+        SELECT similar_node, similarity_type, relation FROM common_parents
         UNION ALL
-        SELECT similar_node, similarity_type, relation_types FROM common_children
+        SELECT similar_node, similarity_type, relation FROM common_children
     ) sim
     JOIN nodes n ON sim.similar_node = n.node_id
     GROUP BY n.node_id, n.node_label
     ORDER BY n.node_label
     """,
     
-    # Query 16: Find the shortest path between two nodes (undirected) and return the path
-    16: """
-        WITH RECURSIVE path_finder AS (
-        SELECT %s::TEXT AS node_id, ARRAY[%s::TEXT] AS path, 0 AS depth
-        UNION ALL
-        SELECT 
-            CASE WHEN e.node1_id = pf.node_id THEN e.node2_id ELSE e.node1_id END AS next_node,
-            pf.path || CASE WHEN e.node1_id = pf.node_id THEN e.node2_id ELSE e.node1_id END,
-            pf.depth + 1
-        FROM edges e
-        JOIN path_finder pf 
-            ON e.node1_id = pf.node_id OR e.node2_id = pf.node_id
-        WHERE 
-            NOT (
-                CASE WHEN e.node1_id = pf.node_id THEN e.node2_id ELSE e.node1_id END
-            ) = ANY(pf.path)
-            AND pf.depth < 6
-            AND NOT %s = ANY(pf.path)  
-    )
-    SELECT path, depth
-    FROM path_finder
-    WHERE node_id = %s
-    ORDER BY depth
-    LIMIT 1
-    """,
-    
     # Query 17: Find all distant synonyms of a given node at specified distance
     17: """
-        WITH RECURSIVE unique_synonym_paths AS (
+        WITH RECURSIVE synonym_paths(node_id, distance, sign, path) AS (
+    -- Base case
+    SELECT 
+        e.dst,
+        1,
+        CASE WHEN r.relation = '/r/Antonym' THEN -1 ELSE 1 END,
+        ARRAY[e.dst]
+    FROM edges_undirected e
+    JOIN relations r ON r.relation_id = e.relation_id
+    WHERE e.src = %s
+    AND r.relation = ANY(%s)
+    
+    UNION ALL
+    
+    -- Recursive case
+    SELECT 
+        e.dst,
+        sp.distance + 1,
+        sp.sign * (CASE WHEN r.relation = '/r/Antonym' THEN -1 ELSE 1 END),
+        sp.path || e.dst
+    FROM edges_undirected e
+    JOIN relations r ON r.relation_id = e.relation_id
+    JOIN synonym_paths sp ON e.src = sp.node_id
+    WHERE 
+        NOT e.dst = ANY(sp.path)
+        AND sp.distance < %s
+        AND r.relation = ANY(%s)
+),
+-- distance always equals array_length(path, 1), so paths are ranked by it directly
+unique_synonym_paths AS (
     SELECT 
         node_id,
         distance,
         sign,
         path,
-        
-        ROW_NUMBER() OVER (PARTITION BY node_id ORDER BY array_length(path, 1)) AS path_rank
-    FROM (
-        WITH RECURSIVE synonym_paths(node_id, distance, sign, path) AS (
-           
-            SELECT 
-                CASE WHEN e.node1_id = %s THEN e.node2_id ELSE e.node1_id END,
-                1,
-                CASE WHEN e.relation = '/r/Antonym' THEN -1 ELSE 1 END,
-                ARRAY[CASE WHEN e.node1_id = %s THEN e.node2_id ELSE e.node1_id END]
-            FROM edges e
-            WHERE (e.node1_id = %s OR e.node2_id = %s)
-            AND e.relation IN ('/r/Synonym', '/r/Antonym')
-            
-            UNION ALL
-            
-            SELECT 
-                CASE WHEN e.node1_id = sp.node_id THEN e.node2_id ELSE e.node1_id END,
-                sp.distance + 1,
-                sp.sign * (CASE WHEN e.relation = '/r/Antonym' THEN -1 ELSE 1 END),
-                sp.path || CASE WHEN e.node1_id = sp.node_id THEN e.node2_id ELSE e.node1_id END
-            FROM edges e
-            JOIN synonym_paths sp ON (e.node1_id = sp.node_id OR e.node2_id = sp.node_id)
-            WHERE 
-                NOT (CASE WHEN e.node1_id = sp.node_id THEN e.node2_id ELSE e.node1_id END) = ANY(sp.path)
-                AND sp.distance < %s
-                AND e.relation IN ('/r/Synonym', '/r/Antonym')
-        )
-        SELECT * FROM synonym_paths
-    ) all_paths
+        ROW_NUMBER() OVER (PARTITION BY node_id ORDER BY distance) AS path_rank
+    FROM synonym_paths
 )
 SELECT DISTINCT ON (n.node_id)
     n.node_id, 
@@ -268,7 +286,7 @@ SELECT DISTINCT ON (n.node_id)
     WHERE sp.distance = %s 
     AND sp.sign = 1
     AND sp.path_rank = 1  -- Tylko jedna ścieżka per węzeł
-    ORDER BY n.node_id, array_length(sp.path, 1)
+    ORDER BY n.node_id, sp.distance
         """,
     
     # Query 18: Find all distant antonyms of a given node at specified distance
@@ -276,36 +294,37 @@ SELECT DISTINCT ON (n.node_id)
         WITH RECURSIVE synonym_paths(node_id, distance, sign, path) AS (
     -- Base case
     SELECT 
-        CASE WHEN e.node1_id = %s THEN e.node2_id ELSE e.node1_id END,
+        e.dst,
         1,
-        CASE WHEN e.relation = '/r/Antonym' THEN -1 ELSE 1 END,
-        ARRAY[CASE WHEN e.node1_id = %s THEN e.node2_id ELSE e.node1_id END]
-    FROM edges e
-    WHERE (e.node1_id = %s OR e.node2_id = %s)
-    AND e.relation IN ('/r/Synonym', '/r/Antonym')
+        CASE WHEN r.relation = '/r/Antonym' THEN -1 ELSE 1 END,
+        ARRAY[e.dst]
+    FROM edges_undirected e
+    JOIN relations r ON r.relation_id = e.relation_id
+    WHERE e.src = %s
+    AND r.relation = ANY(%s)
     
     UNION ALL
     
     -- Recursive case
     SELECT 
-        CASE WHEN e.node1_id = sp.node_id THEN e.node2_id ELSE e.node1_id END,
+        e.dst,
         sp.distance + 1,
-        sp.sign * (CASE WHEN e.relation = '/r/Antonym' THEN -1 ELSE 1 END),
-        sp.path || CASE WHEN e.node1_id = sp.node_id THEN e.node2_id ELSE e.node1_id END
-    FROM edges e
-    JOIN synonym_paths sp ON 
-        (e.node1_id = sp.node_id OR e.node2_id = sp.node_id)
+        sp.sign * (CASE WHEN r.relation = '/r/Antonym' THEN -1 ELSE 1 END),
+        sp.path || e.dst
+    FROM edges_undirected e
+    JOIN relations r ON r.relation_id = e.relation_id
+    JOIN synonym_paths sp ON e.src = sp.node_id
     WHERE 
-        NOT (CASE WHEN e.node1_id = sp.node_id THEN e.node2_id ELSE e.node1_id END) = ANY(sp.path)
+        NOT e.dst = ANY(sp.path)
         AND sp.distance < %s
-        AND e.relation IN ('/r/Synonym', '/r/Antonym')
+        AND r.relation = ANY(%s)
 ),
 ranked_paths AS (
     SELECT 
         node_id,
         distance,
         path,
-        ROW_NUMBER() OVER (PARTITION BY node_id ORDER BY array_length(path, 1)) AS rn
+        ROW_NUMBER() OVER (PARTITION BY node_id ORDER BY distance) AS rn
     FROM synonym_paths
     WHERE sign = -1
 )
@@ -319,7 +338,55 @@ ORDER BY n.node_id
 }
 
 
-def run_query(goal, node_id=None, new_id=None, new_label=None, node2_id=None, distance=None):
+def get_pool():
+    """Return the shared connection pool, opening it on first use"""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(kwargs=DB_PARAMS, min_size=1, max_size=4, timeout=10, open=True)
+    return _pool
+
+
+def close_pool():
+    """Close all pooled connections"""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def get_labels(cur, node_ids):
+    """Return {node_id: label} for the given nodes, querying only those not cached yet"""
+    missing = [node for node in node_ids if node not in _label_cache]
+    if missing:
+        cur.execute("SELECT node_id, node_label FROM nodes WHERE node_id = ANY(%s)", (missing,), prepare=True)
+        _label_cache.update(cur.fetchall())
+
+    labels = {}
+    for node in node_ids:
+        if node in _label_cache:
+            _label_cache.move_to_end(node)
+            labels[node] = _label_cache[node]
+    while len(_label_cache) > LABEL_CACHE_SIZE:
+        _label_cache.popitem(last=False)
+    return labels
+
+
+def as_text(value, sep=", "):
+    """Join an array column into display text; scalar values are returned unchanged"""
+    return sep.join(value) if isinstance(value, list) else value
+
+
+def stream_rows(conn, query, params=None):
+    """Yield result rows from a server-side cursor, STREAM_BATCH_SIZE rows at a time"""
+    # Named cursors only live inside a transaction, and the connection is in autocommit mode
+    with conn.transaction(), conn.cursor(name="cskg_stream", binary=True) as cur:
+        cur.itersize = STREAM_BATCH_SIZE
+        cur.execute(query, params)
+        yield from cur
+
+
+def run_query(goal, node_id=None, new_id=None, new_label=None, node2_id=None, distance=None, approx=False,
+              conn=None):
     """
     Execute a database query based on the specified goal and parameters.
     
@@ -330,287 +397,302 @@ def run_query(goal, node_id=None, new_id=None, new_label=None, node2_id=None, di
         new_label (str): New node label for rename operation (query 14)
         node2_id (str): Second node ID for path finding (query 16)
         distance (int): Distance parameter for synonym/antonym queries (17-18)
+        approx (bool): Answer the node count (query 9) from planner statistics instead of a scan
+        conn (psycopg.Connection): Open connection to reuse; borrowed from the pool when omitted
     """
-    conn = None
     try:
-        # Establish database connection
-        conn = psycopg2.connect(
-            dbname="Projects2025",
-            user="postgres",
-            password="postgres",
-            host="localhost"
-        )
-        conn.autocommit = False
-        cur = conn.cursor()
+        with nullcontext(conn) if conn is not None else get_pool().connection() as conn:
+            # Results come back in binary format, so counts and text[] columns skip text parsing
+            cur = conn.cursor(binary=True)
 
-        start_time = time.time()  # Start timing
+            start_time = time.time()  # Start timing
 
-        # Handle different query types with their required parameters
-        if goal == 14:
-            if not new_id or not new_label:
-                print("Error: For operation 14, provide both new_id and new_label")
-                return
-            
-            try:
-                # Check if new ID already exists
-                cur.execute("SELECT 1 FROM nodes WHERE node_id = %s", (new_id,))
-                if cur.fetchone():
-                    print(f"Error: Node ID {new_id} already exists")
+            # Handle different query types with their required parameters
+            if goal == 14:
+                if not new_id or not new_label:
+                    print("Error: For operation 14, provide both new_id and new_label")
                     return
+            
+                try:
+                    # Check if new ID already exists
+                    cur.execute("SELECT 1 FROM nodes WHERE node_id = %s", (new_id,))
+                    if cur.fetchone():
+                        print(f"Error: Node ID {new_id} already exists")
+                        return
                 
-                # Check if source node exists
-                cur.execute("SELECT 1 FROM nodes WHERE node_id = %s", (node_id,))
-                if not cur.fetchone():
-                    print(f"Error: Source node {node_id} does not exist")
-                    return
+                    # Check if source node exists
+                    cur.execute("SELECT 1 FROM nodes WHERE node_id = %s", (node_id,))
+                    if not cur.fetchone():
+                        print(f"Error: Source node {node_id} does not exist")
+                        return
                 
-                # Execute transaction
-                cur.execute(QUERIES[14], (
-                    new_id, new_label,    # INSERT new node
-                    new_id, node_id,      # UPDATE edges.node1_id
-                    new_id, node_id,      # UPDATE edges.node2_id
-                    node_id               # DELETE old node
-                ))
-                conn.commit()
-                execution_time = time.time() - start_time
-                print(f"Successfully renamed node {node_id} to {new_id} with label '{new_label}'")
-                print(f"Execution time: {execution_time:.4f} seconds")
-            except psycopg2.Error as e:
-                conn.rollback()
-                print(f"Error renaming node: {e.pgerror}")
-            return
-
-        elif goal == 15:
-            # Find similar nodes (common parents or children)
-            if not node_id:
-                print("Error: For operation 15, provide node_id")
+                    # Execute transaction
+                    insert_node, update_node1, update_node2, update_out_rels, update_degree, delete_node = QUERIES[14]
+                    with conn.transaction():
+                        cur.execute(insert_node, (new_id, new_label))
+                        cur.execute(update_node1, (new_id, node_id))
+                        cur.execute(update_node2, (new_id, node_id))
+                        cur.execute(update_out_rels, (new_id, new_id))
+                        cur.execute(update_degree, (new_id, new_label, node_id))
+                        cur.execute(delete_node, (node_id,))
+                    _label_cache.pop(node_id, None)
+                    execution_time = time.time() - start_time
+                    print(f"Successfully renamed node {node_id} to {new_id} with label '{new_label}'")
+                    print(f"Execution time: {execution_time:.4f} seconds")
+                except psycopg.Error as e:
+                    print(f"Error renaming node: {e}")
                 return
+
+            elif goal == 15:
+                # Find similar nodes (common parents or children)
+                if not node_id:
+                    print("Error: For operation 15, provide node_id")
+                    return
             
-            try:
-                # Execute with node_id repeated for both parameters
-                cur.execute(QUERIES[15], (node_id, node_id, node_id, node_id))
-                results = cur.fetchall()
-                execution_time = time.time() - start_time
+                try:
+                    # Execute with node_id repeated for both parameters
+                    rows = stream_rows(conn, QUERIES[15], (node_id, node_id, node_id, node_id))
+                    row = next(rows, None)
                 
-                if not results:
-                    print(f"No similar nodes found for node {node_id}")
-                else:
-                    print(f"Similar nodes for {node_id}:")
-                    for row in results:
-                        print(f"- Node: {row[0]} | Label: {row[1]} | Similarity Type: {row[2]} | Relation: {row[3]}")
-                print(f"Execution time: {execution_time:.4f} seconds")
-            except psycopg2.Error as e:
-                print(f"Database error: {e.pgerror}")
-            return
-          
-        elif goal == 16:
-            if not node_id or not node2_id:
-                print("Error: For operation 16, provide both node_id and node2_id")
+                    if row is None:
+                        print(f"No similar nodes found for node {node_id}")
+                    else:
+                        print(f"Similar nodes for {node_id}:")
+                        while row is not None:
+                            print(f"- Node: {row[0]} | Label: {row[1]} | Similarity Type: {as_text(row[2], ' | ')} | Relation: {as_text(row[3], ' | ')}")
+                            row = next(rows, None)
+                    execution_time = time.time() - start_time
+                    print(f"Execution time: {execution_time:.4f} seconds")
+                except psycopg.Error as e:
+                    print(f"Database error: {e}")
                 return
+          
+            elif goal == 16:
+                if not node_id or not node2_id:
+                    print("Error: For operation 16, provide both node_id and node2_id")
+                    return
 
-            from collections import deque
-
-            print(f"Running BFS from {node_id} to {node2_id}...")
-
-            # Parameters
-            max_depth = 10
-            important_relations = [
-            '/r/RelatedTo', '/r/IsA', '/r/PartOf',
-            '/r/HasA', '/r/UsedFor', '/r/CapableOf', '/r/AtLocation'
-            ]
-
-            visited = set()
-            queue = deque()
-            queue.append((node_id, [node_id]))
-
-            found = False
-
-            while queue:
-                current, path = queue.popleft()
-
-                if current == node2_id:
-                    found = True
-                    break
+                print(f"Running BFS from {node_id} to {node2_id}...")
 
-                if len(path) > max_depth:
-                    continue
+                # Parameters
+                max_depth = 10
+                important_relations = [
+                '/r/RelatedTo', '/r/IsA', '/r/PartOf',
+                '/r/HasA', '/r/UsedFor', '/r/CapableOf', '/r/AtLocation'
+                ]
 
-                if current in visited:
-                    continue
+                # Level-synchronous BFS: the whole frontier is expanded with one query per depth,
+                # and parent pointers are kept for rebuilding the path once the target is reached
+                parent = {node_id: None}
+                frontier = [node_id]
+                depth = 0
+                found = node_id == node2_id
 
-                visited.add(current)
+                while frontier and not found and depth < max_depth:
+                    # Edges are treated as undirected: edges_undirected holds both directions, and
+                    # duplicates are dropped by the parent check below
+                    cur.execute("""
+                        SELECT src, dst FROM edges_undirected
+                        WHERE src = ANY(%s)
+                        AND relation_id IN (SELECT relation_id FROM relations WHERE relation = ANY(%s))
+                    """, (frontier, important_relations), prepare=True)
 
-                # Get neighbors of current node ON DEMAND
-                cur.execute("""
-                    SELECT node2_id FROM edges 
-                    WHERE node1_id = %s AND relation = ANY(%s)
-                    UNION
-                    SELECT node1_id FROM edges 
-                    WHERE node2_id = %s AND relation = ANY(%s)
-                """, (current, important_relations, current, important_relations))
+                    frontier = []
+                    for current, neighbor in cur.fetchall():
+                        if neighbor not in parent:
+                            parent[neighbor] = current
+                            frontier.append(neighbor)
 
-                neighbors = [row[0] for row in cur.fetchall()]
+                    depth += 1
+                    found = node2_id in parent
 
-                for neighbor in neighbors:
-                    if neighbor not in visited and neighbor not in path:
-                        queue.append((neighbor, path + [neighbor]))
+                if found:
+                    path = [node2_id]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])
+                    path.reverse()
 
-            execution_time = time.time() - start_time
-            # Result
-            if found:
-                print(f"Shortest path distance: {len(path) - 1}")
-                print("Path nodes:")
-                for node in path:
-                    cur.execute("SELECT node_label FROM nodes WHERE node_id = %s", (node,))
-                    label = cur.fetchone()
-                    label = label[0] if label else "Unknown"
-                    print(f"- {node} ({label})")
-            else:
-                print("No path found between the nodes")
-            print(f"Execution time: {execution_time:.4f} seconds")
-            return
-                            
-        elif goal in [17, 18]:
-            # Distant synonyms/antonyms queries
-            if not node_id or distance is None:
-                print(f"Error: For operation {goal}, provide node_id and distance parameters")
-                return
-            
-            # Prepare parameters (4x node_id + 2x distance)
-            params = (node_id, node_id, node_id, node_id, distance, distance)
-            
-            try:
-                cur.execute(QUERIES[goal], params)
-                results = cur.fetchall()
                 execution_time = time.time() - start_time
-                
-                if not results:
-                    relation_type = "synonyms" if goal == 17 else "antonyms"
-                    print(f"No distant {relation_type} found for node {node_id} at distance {distance}")
+                # Result
+                if found:
+                    print(f"Shortest path distance: {len(path) - 1}")
+                    print("Path nodes:")
+                    # Uncached labels on the path are resolved in a single round-trip
+                    labels = get_labels(cur, path)
+                    for node in path:
+                        print(f"- {node} ({labels.get(node, 'Unknown')})")
                 else:
-                    relation_type = "synonyms" if goal == 17 else "antonyms"
-                    print(f"Distant {relation_type} of {node_id} at distance {distance}:")
-                    for row in results:
-                        if row[0] != node_id:  
-                            print(f"- {row[0]}: {row[1]}")
+                    print("No path found between the nodes")
                 print(f"Execution time: {execution_time:.4f} seconds")
-            except psycopg2.Error as e:
-                print(f"Database error: {e.pgerror}")
-            
-            return
-        elif goal == 12:
-            # First get all nodes and their labels
-            cur.execute("SELECT node_id, node_label FROM nodes")
-            nodes = {row[0]: row[1] for row in cur.fetchall()}
-            
-            # Initialize degree dictionary
-            degrees = {node_id: 0 for node_id in nodes}
-            
-            # Count neighbors from node1_id (outgoing)
-            cur.execute("SELECT node1_id, COUNT(DISTINCT node2_id) FROM edges GROUP BY node1_id")
-            for node1_id, count in cur.fetchall():
-                if node1_id in degrees:
-                    degrees[node1_id] += count
-            
-            # Count neighbors from node2_id (incoming)
-            cur.execute("SELECT node2_id, COUNT(DISTINCT node1_id) FROM edges GROUP BY node2_id")
-            for node2_id, count in cur.fetchall():
-                if node2_id in degrees:
-                    degrees[node2_id] += count
-            
-            # Find maximum degree
-            max_degree = max(degrees.values())
+                return
+                            
+            elif goal in [17, 18]:
+                # Distant synonyms/antonyms queries
+                if not node_id or distance is None:
+                    print(f"Error: For operation {goal}, provide node_id and distance parameters")
+                    return
             
-            # Get all nodes with maximum degree
-            most_connected = [(node_id, nodes[node_id], degree) 
-                            for node_id, degree in degrees.items() 
-                            if degree == max_degree]
+                # Prepare parameters (node_id, then relation list and distance for each arm)
+                params = (node_id, SYNONYM_RELATIONS, distance, SYNONYM_RELATIONS, distance)
             
-            # Sort by node_id for consistent output
-            most_connected.sort()
+                try:
+                    rows = stream_rows(conn, QUERIES[goal], params)
+                    row = next(rows, None)
+                
+                    if row is None:
+                        relation_type = "synonyms" if goal == 17 else "antonyms"
+                        print(f"No distant {relation_type} found for node {node_id} at distance {distance}")
+                    else:
+                        relation_type = "synonyms" if goal == 17 else "antonyms"
+                        print(f"Distant {relation_type} of {node_id} at distance {distance}:")
+                        while row is not None:
+                            if row[0] != node_id:  
+                                print(f"- {row[0]}: {row[1]}")
+                            row = next(rows, None)
+                    execution_time = time.time() - start_time
+                    print(f"Execution time: {execution_time:.4f} seconds")
+                except psycopg.Error as e:
+                    print(f"Database error: {e}")
             
-            execution_time = time.time() - start_time
-            #print(f"Most connected nodes (degree = {max_degree}):")
-            for node_id, label, degree in most_connected:
-                print(f"- Node: {node_id} | Label: {label} ")
-            print(f"Execution time: {execution_time:.4f} seconds")
-            return
-        
-        elif goal in [5, 6]:
-            # Queries that need node_id twice
-            cur.execute(QUERIES[goal], (node_id, node_id))
-        elif node_id:
-            # Queries that need node_id once
-            cur.execute(QUERIES[goal], (node_id,))
-        else:
-            # Queries with no parameters
-            cur.execute(QUERIES[goal])
-        
-        execution_time = time.time() - start_time
-        
-        # Process and display results based on query type
-        if goal in [1, 3, 5, 7, 8]:
-            results = cur.fetchall()
-            if not results:
-                print("No results found")
+                return
+            elif goal in [1, 2, 3, 4, 5, 6, 7, 8]:
+                # Queries that need node_id once
+                params = (node_id,)
             else:
-                for row in results:
+                # Queries with no parameters
+                params = None
+        
+            # Process and display results based on query type
+            if goal in [1, 3, 5, 7, 8, 12]:
+                # Multi-row results are streamed from the server instead of fetched all at once;
+                # goal 12 only returns the nodes tied for the top degree, so it keeps its prepared statement
+                if goal == 12:
+                    rows = cur.execute(QUERIES[goal], params, prepare=True)
+                else:
+                    rows = stream_rows(conn, QUERIES[goal], params)
+                found = False
+                for row in rows:
+                    found = True
                     if goal == 5:
-                        print(f"Node: {row[0]} | Label: {row[1]} | Relation: {row[2]} | Type: {row[3]}")
+                        print(f"Node: {as_text(row[0])} | Label: {row[1]} | Relation: {as_text(row[2])} | Type: {as_text(row[3])}")
                     elif goal == 12:
                         print(f"Node: {row[0]} | Label: {row[1]} | Neighbor count: {row[2]}")
-                    elif goal == 15:
-                        print(f"Similar Node: {row[0]} | Label: {row[1]} | Relation: {row[2]} | Similarity Type: {row[3]}")
                     else:
-                        print(f"Node: {row[0]} | Label: {row[1]} | Relation: {row[2]}")
-        else:
-            # Count queries
-            count = cur.fetchone()[0]
-            print(f"Count: {count}")
+                        print(f"Node: {as_text(row[0])} | Label: {row[1]} | Relation: {as_text(row[2])}")
+                if not found:
+                    print("No results found")
+            else:
+                # Count queries
+                count = None
+                if goal == 9 and approx:
+                    cur.execute(APPROX_NODE_COUNT, prepare=True)
+                    count = cur.fetchone()[0]
+                    if count <= 0:
+                        # No statistics yet (or an empty table, which is cheap to count exactly)
+                        count = None
+                    else:
+                        print(f"Approximate count: {count}")
+                if count is None:
+                    cur.execute(QUERIES[goal], params, prepare=True)
+                    count = cur.fetchone()[0]
+                    print(f"Count: {count}")
         
-        print(f"Execution time: {execution_time:.4f} seconds")
+            execution_time = time.time() - start_time
+            print(f"Execution time: {execution_time:.4f} seconds")
 
-    except psycopg2.Error as e:
-        print(f"Database error: {e.pgerror}")
-        if conn:
-            conn.rollback()
+    except psycopg.Error as e:
+        print(f"Database error: {e}")
     except Exception as e:
         print(f"Error: {str(e)}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
 
 
-def main():
-    """Main function to parse arguments and execute queries"""
+def build_parser():
+    """Build the argument parser shared by the command line and the REPL"""
     parser = argparse.ArgumentParser(
         description="CSKG Database CLI Tool",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    parser.add_argument("goal", type=int, help="Operation number (1-18)")
+    parser.add_argument("goal", type=int, nargs="?", help="Operation number (1-18, 0 starts the REPL)")
     parser.add_argument("--node_id", help="Node ID (required for operations 1-8,14-18)")
     parser.add_argument("--new_id", help="New node ID (required for operation 14)")
     parser.add_argument("--new_label", help="New node label (required for operation 14)")
     parser.add_argument("--node2_id", help="Second node ID (required for operation 16)")
     parser.add_argument("--distance", type=int, help="Distance parameter (required for operations 17-18)")
-    
-    args = parser.parse_args()
-    
-    # Validate input parameters
-    if args.goal < 1 or args.goal > 18:
-        print("Error: Operation must be between 1 and 18")
+    parser.add_argument("--approx", action="store_true",
+                        help="Estimate the node count (operation 9) from planner statistics")
+    parser.add_argument("--repl", action="store_true", help="Read operations from stdin over one open connection")
+    return parser
+
+
+def validate_args(args):
+    """Return an error message if the parameters don't fit the operation, None otherwise"""
+    if args.goal is None:
+        return "Error: Operation number required"
+    elif args.goal < 1 or args.goal > 18:
+        return "Error: Operation must be between 1 and 18"
     elif args.goal in [1,2,3,4,5,6,7,8,14,15,17,18] and not args.node_id:
-        print(f"Error: node_id required for operation {args.goal}")
+        return f"Error: node_id required for operation {args.goal}"
     elif args.goal == 14 and (not args.new_id or not args.new_label):
-        print("Error: Both new_id and new_label required for operation 14")
+        return "Error: Both new_id and new_label required for operation 14"
     elif args.goal == 16 and (not args.node_id or not args.node2_id):
-        print("Error: Both node_id and node2_id required for operation 16")
+        return "Error: Both node_id and node2_id required for operation 16"
     elif args.goal in [17, 18] and args.distance is None:
-        print(f"Error: distance parameter required for operation {args.goal}")
-    else:
-        run_query(args.goal, args.node_id, args.new_id, args.new_label, args.node2_id, args.distance)
+        return f"Error: distance parameter required for operation {args.goal}"
+    return None
+
+
+def repl(parser):
+    """Interactive mode: run operations read from stdin, keeping one connection
+    (and its prepared statements and label cache) alive between them"""
+    print("CSKG interactive mode. Enter an operation, e.g. '1 --node_id /c/en/dog', or 'quit' to exit.")
+    with get_pool().connection() as conn:
+        while True:
+            try:
+                line = input("cskg> ").strip()
+            except (EOFError, KeyboardInterrupt):
+                print()
+                break
+            if line in ("quit", "exit"):
+                break
+            if not line:
+                continue
+
+            try:
+                args = parser.parse_args(shlex.split(line))
+            except ValueError as e:
+                print(f"Error: {e}")
+                continue
+            except SystemExit:
+                # argparse has already printed the usage message
+                continue
+
+            error = validate_args(args)
+            if error:
+                print(error)
+            else:
+                run_query(args.goal, args.node_id, args.new_id, args.new_label, args.node2_id, args.distance,
+                          args.approx, conn=conn)
+
+
+def main():
+    """Main function to parse arguments and execute queries"""
+    parser = build_parser()
+    args = parser.parse_args()
+    
+    try:
+        if args.repl or args.goal == 0:
+            repl(parser)
+            return
+
+        # Validate input parameters
+        error = validate_args(args)
+        if error:
+            print(error)
+        else:
+            run_query(args.goal, args.node_id, args.new_id, args.new_label, args.node2_id, args.distance,
+                      args.approx)
+    finally:
+        close_pool()
 
 
 if __name__ == "__main__":
@@ -1,182 +1,491 @@
-import psycopg2
-from psycopg2.extras import execute_values
+import psycopg
 import argparse
+import csv
+import multiprocessing
+import os
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import chain, islice
 from tqdm import tqdm  # Added progress bar
 
-def execute_batches(cur, nodes_batch, edges_batch):
-    """Common method for data batches with improved error handling"""
+DB_PARAMS = {
+    "dbname": "Projects2025",
+    "user": "postgres",
+    "password": "postgres",
+    "host": "localhost",
+    "port": "5432",
+    "connect_timeout": 10,
+}
+
+EDGE_COLUMNS = "(edge_id, node1_id, node2_id, relation_id)"
+
+# Binary COPY sends values in their on-disk format, so the types must match the columns exactly
+EDGE_TYPES = ["int8", "text", "text", "int4"]
+NODE_TYPES = ["text", "text", "int8"]
+
+# Read buffer for the TSV file, so each read syscall returns a megabyte instead of 8 KiB
+READ_BUFFER = 1 << 20
+
+# Upper bound on the bytes of TSV handled by one worker task, so progress is reported
+# regularly and a slow shard doesn't leave the other workers idle. Since a nodes_cache only
+# lives for one shard, this also bounds its size (about a million ids at CSKG line lengths)
+SHARD_SIZE = 64 << 20
+
+# Most bytes of TSV sent in one edge COPY, so batches of long lines stay a bounded size
+BATCH_BYTES = 16 << 20
+
+# Memory for index builds, shared by the builds running at the same time
+MAINTENANCE_WORK_MEM_MB = 2048
+
+# Parallel workers PostgreSQL may use inside each btree index build
+INDEX_BUILD_WORKERS = 4
+
+# Indexes dropped for the import; each list is built in parallel once its table is loaded
+EDGE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS node1_idx ON edges (node1_id)",
+    "CREATE INDEX IF NOT EXISTS node2_idx ON edges (node2_id)",
+    "CREATE INDEX IF NOT EXISTS node_idx ON nodes (node_id)",
+]
+UNDIRECTED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS edges_undirected_src_rel ON edges_undirected (src, relation_id)",
+    "CREATE INDEX IF NOT EXISTS edges_undirected_edge ON edges_undirected (edge_id)",
+]
+
+def connect():
+    """Open a connection with the session tuned for bulk loading"""
+    conn = psycopg.connect(**DB_PARAMS)
+    conn.autocommit = False
+    # Bulk-load session settings: commits don't wait for the WAL flush (a crash can only lose
+    # the last few commits, which a re-run restores), and the restore step's index builds
+    # and aggregations get more memory
+    conn.execute(f"""
+        SET synchronous_commit = off;
+        SET maintenance_work_mem = '{MAINTENANCE_WORK_MEM_MB}MB';
+        SET work_mem = '256MB';
+    """)
+    conn.commit()
+    return conn
+
+class RelationIds(dict):
+    """(relation, relation_label) -> relation_id, inserting unknown pairs into relations on first use.
+    Inserts go through their own autocommit connection, so a new row is visible to the other
+    workers at once and no worker holds its lock for the length of a load transaction."""
+
+    def __init__(self, conn):
+        super().__init__()
+        self._conn = conn
+
+    def __missing__(self, key):
+        relation_id = self._conn.execute("""
+            INSERT INTO relations (relation, relation_label) VALUES (%s, %s)
+            ON CONFLICT (relation, relation_label) DO UPDATE SET relation = EXCLUDED.relation
+            RETURNING relation_id
+        """, key).fetchone()[0]
+        self[key] = relation_id
+        return relation_id
+
+def copy_rows(cur, statement, types, rows):
+    """Stream rows into a COPY ... FROM STDIN (FORMAT BINARY) statement"""
+    with cur.copy(f"{statement} FROM STDIN (FORMAT BINARY)") as copy:
+        copy.set_types(types)
+        for row in rows:
+            copy.write_row(row)
+
+def edge_batches(rows, size, max_bytes):
+    """Split edge rows into batches of at most size rows covering about max_bytes of the file.
+    Edge ids are line offsets, so a batch ends at the first row max_bytes past its first one.
+    Each batch must be consumed before the next one is requested."""
+    def until(limit):
+        for row in rows:
+            yield row
+            if row[0] >= limit:
+                return
+    for first in rows:
+        yield chain((first,), islice(until(first[0] + max_bytes), size - 1))
+
+def shard_ranges(tsv_path, count):
+    """Split the file after its header into about count byte ranges on line boundaries"""
+    size = os.path.getsize(tsv_path)
+    with open(tsv_path, 'rb') as f:
+        f.readline()  # Skip header
+        first = f.tell()
+        bounds = [first]
+        for i in range(1, count):
+            # Snap to the start of the next line; stepping back one byte keeps a line that
+            # begins exactly at the offset in this range
+            f.seek(max(first + (size - first) * i // count - 1, 0))
+            f.readline()
+            bounds.append(f.tell())
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+def shard_lines(f, start, end, position):
+    """Yield the decoded lines that start in bytes [start, end) of a binary file,
+    keeping the byte offset of the line last yielded in position[0]"""
+    f.seek(start)
+    offset = start
+    while offset < end:
+        line = f.readline()
+        if not line:
+            break
+        position[0] = offset
+        offset += len(line)
+        if b'\0' in line:
+            # PostgreSQL text can't hold NUL bytes; an empty line parses to no fields and is skipped
+            line = b''
+        yield line.decode('utf-8')
+
+def edge_rows(reader, nodes_cache, relation_ids, stats, position):
+    """Turn parsed TSV records into edge rows, recording each node's shortest label in nodes_cache.
+    The edge id is the byte offset of the record's line, unique without coordinating workers."""
+    while True:
+        try:
+            fields = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # A malformed line (e.g. a field over csv.field_size_limit()) is skipped, like any other bad line
+            print(f"Error in line at byte {position[0]}: {str(e)}")
+            stats["skipped"] += 1
+            continue
+
+        edge_id = position[0]
+        try:
+            if len(fields) < 7:  # Minimum required number of fields
+                stats["skipped"] += 1
+                continue
+
+            _, node1_id, relation, node2_id, node1_label, node2_label, relation_label, *_ = fields
+            # One shared string object per node id for the cache keys and edge rows
+            node1_id, node2_id = sys.intern(node1_id), sys.intern(node2_id)
+
+            # Adding nodes, keeping the shortest label of each and where it was first seen
+            old = nodes_cache.get(node1_id)
+            if old is None or len(node1_label) < len(old[0]):
+                nodes_cache[node1_id] = (node1_label, edge_id)
+
+            old = nodes_cache.get(node2_id)
+            if old is None or len(node2_label) < len(old[0]):
+                nodes_cache[node2_id] = (node2_label, edge_id)
+
+            row = (edge_id, node1_id, node2_id, relation_ids[relation, relation_label])
+        except Exception as e:
+            line = "\t".join(fields)
+            print(f"Error in line: {line[:100]}... | {str(e)}")
+            stats["skipped"] += 1
+            continue
+
+        stats["edges"] += 1
+        yield row
+
+def execute_batches(cur, nodes_batch, edges_batch, clean=False):
+    """Common method for data batches with improved error handling.
+    Both batches are iterables of row tuples. Returns the number of edges left out
+    because an edge with the same edge_id already exists."""
     try:
         if nodes_batch:
-            execute_values(
-                cur,
-                """INSERT INTO nodes (node_id, node_label) 
-                   VALUES %s 
-                   ON CONFLICT (node_id) DO UPDATE 
-                   SET node_label = EXCLUDED.node_label 
-                   WHERE LENGTH(EXCLUDED.node_label) < LENGTH(nodes.node_label)""",
-                nodes_batch,
-                page_size=1000
-            )
+            # Nodes from all shards meet in nodes_stage and are merged once at the end
+            copy_rows(cur, "COPY nodes_stage (node_id, node_label, seen_at)", NODE_TYPES, nodes_batch)
         
         if edges_batch:
-            execute_values(
-                cur,
-                """INSERT INTO edges (edge_id, node1_id, node2_id, relation, relation_label)
-                   VALUES %s
-                   ON CONFLICT (edge_id) DO NOTHING""",  # Added conflict handling
-                edges_batch,
-                page_size=1000
-            )
+            if clean:
+                # Freshly truncated table: edge ids cannot collide, so COPY straight in
+                copy_rows(cur, f"COPY edges {EDGE_COLUMNS}", EDGE_TYPES, edges_batch)
+            else:
+                # Existing rows may share edge ids, so COPY into staging and skip conflicts.
+                # An edge_id is the line's byte offset, so this only recognises the same line
+                # of the same file: a line at that offset in an edited or other file is skipped
+                # too, and counted so the summary can report it
+                copy_rows(cur, f"COPY edges_stage {EDGE_COLUMNS}", EDGE_TYPES, edges_batch)
+                cur.execute(f"""
+                    INSERT INTO edges {EDGE_COLUMNS}
+                    SELECT * FROM edges_stage
+                    ON CONFLICT (edge_id) DO NOTHING
+                """)
+                inserted = cur.rowcount
+                cur.execute("SELECT COUNT(*) FROM edges_stage")
+                staged = cur.fetchone()[0]
+                cur.execute("TRUNCATE edges_stage")
+                return staged - inserted
+        return 0
     except Exception as e:
         print(f"Error during batch execution: {str(e)}")
         raise
 
-def count_lines(file_path):
-    """Function to count lines in file for progress bar"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return sum(1 for _ in f)
+def stage_nodes(cur, nodes_cache, clean=False):
+    """Copy the cached nodes into nodes_stage and empty the cache"""
+    execute_batches(cur, ((node, label, seen_at) for node, (label, seen_at) in nodes_cache.items()),
+                    None, clean)
+    nodes_cache.clear()
+
+def import_shard(task):
+    """Load the lines starting in one byte range of the file over a connection of its own.
+    Runs in a worker process; returns (bytes covered, edges imported, lines skipped,
+    edges left out because their edge_id already exists)."""
+    tsv_path, start, end, batch_size, clean = task
+    nodes_cache = {}  # node_id -> (shortest label, edge id of the line it was seen on)
+    stats = {"edges": 0, "skipped": 0, "existing": 0}
+    position = [start]
+
+    with connect() as conn, psycopg.connect(**DB_PARAMS, autocommit=True) as relation_conn, \
+         open(tsv_path, 'rb', buffering=READ_BUFFER) as f:
+        cur = conn.cursor()
+        relation_ids = RelationIds(relation_conn)
+        if not clean:
+            cur.execute("CREATE TEMP TABLE edges_stage (LIKE edges)")
+
+        # Plain tab-separated fields (CSKG doesn't quote), split by the C csv parser
+        reader = csv.reader(shard_lines(f, start, end, position), delimiter='\t', quoting=csv.QUOTE_NONE)
+
+        # Edges are streamed straight from the file into one COPY per batch of
+        # batch_size lines or BATCH_BYTES of the file, whichever comes first
+        rows = edge_rows(reader, nodes_cache, relation_ids, stats, position)
+        for edges_batch in edge_batches(rows, batch_size, BATCH_BYTES):
+            stats["existing"] += execute_batches(cur, None, edges_batch, clean)
+
+        # The shard's nodes are staged for the final merge (foreign keys are dropped
+        # until the restore step, so edges may arrive before their nodes)
+        stage_nodes(cur, nodes_cache, clean)
+
+    # The whole shard is one transaction, committed as the connection closes: a shard's
+    # edges and its staged nodes land together or not at all, with one WAL flush per shard
+
+    return end - start, stats["edges"] - stats["existing"], stats["skipped"], stats["existing"]
+
+def build_indexes(statements, workers):
+    """Run independent CREATE INDEX statements side by side, each over a connection of its own.
+    Each index build may also use parallel workers, and the builds split the memory budget."""
+    running = max(1, min(workers, len(statements)))
 
-def import_data(tsv_path, batch_size=50000, clean=False):
+    def run(statement):
+        with connect() as conn:
+            conn.execute(f"""
+                SET max_parallel_maintenance_workers = {INDEX_BUILD_WORKERS};
+                SET maintenance_work_mem = '{MAINTENANCE_WORK_MEM_MB // running}MB';
+            """)
+            conn.execute(statement)
+
+    with ThreadPoolExecutor(running) as pool:
+        list(pool.map(run, statements))
+
+def merge_nodes(cur):
+    """Move the staged nodes into nodes and drop nodes_stage.
+    Returns the number of nodes inserted plus existing nodes given a shorter label."""
+    print("Merging nodes...")
+    # One row per node: the shortest label, the earliest line among equally short ones
+    cur.execute("""
+        INSERT INTO nodes (node_id, node_label)
+        SELECT DISTINCT ON (node_id) node_id, node_label
+        FROM nodes_stage
+        ORDER BY node_id, LENGTH(node_label), seen_at
+        ON CONFLICT (node_id) DO UPDATE 
+        SET node_label = EXCLUDED.node_label 
+        WHERE LENGTH(EXCLUDED.node_label) < LENGTH(nodes.node_label)
+    """)
+    merged = cur.rowcount
+    cur.execute("DROP TABLE nodes_stage")
+    return merged
+
+def restore_schema(workers=1):
+    """Re-create the indexes, constraints and derived data dropped for the import"""
+    print("Restoring indexes and constraints...")
+    build_indexes(EDGE_INDEXES, workers)
+    with connect() as conn:
+        cur = conn.cursor()
+        # Left over by a failed import: the shards that finished committed their edges
+        # along with their staged nodes, so the nodes must be merged before the keys go on
+        cur.execute("SELECT to_regclass('nodes_stage') IS NOT NULL")
+        if cur.fetchone()[0]:
+            merge_nodes(cur)
+            conn.commit()
+
+        # NOT VALID skips checking the loaded rows (new writes are still checked);
+        # validate_constraints() checks them later without blocking queries
+        cur.execute("""
+            ALTER TABLE edges DROP CONSTRAINT IF EXISTS edges_node1_id_fkey;
+            ALTER TABLE edges DROP CONSTRAINT IF EXISTS edges_node2_id_fkey;
+            ALTER TABLE edges DROP CONSTRAINT IF EXISTS edges_relation_id_fkey;
+            ALTER TABLE edges ADD CONSTRAINT edges_node1_id_fkey 
+                FOREIGN KEY (node1_id) REFERENCES nodes (node_id) ON DELETE CASCADE NOT VALID;
+            ALTER TABLE edges ADD CONSTRAINT edges_node2_id_fkey 
+                FOREIGN KEY (node2_id) REFERENCES nodes (node_id) ON DELETE CASCADE NOT VALID;
+            ALTER TABLE edges ADD CONSTRAINT edges_relation_id_fkey 
+                FOREIGN KEY (relation_id) REFERENCES relations (relation_id) NOT VALID;
+        """)
+        conn.commit()
+
+        # The row trigger was off during the load, so both directions are rebuilt in one pass
+        print("Rebuilding undirected edges...")
+        cur.execute("""
+            ALTER TABLE edges ENABLE TRIGGER edges_undirected_sync;
+            TRUNCATE edges_undirected;
+            INSERT INTO edges_undirected (edge_id, src, dst, relation_id)
+            SELECT edge_id, node1_id, node2_id, relation_id FROM edges
+            UNION ALL
+            SELECT edge_id, node2_id, node1_id, relation_id FROM edges;
+        """)
+        conn.commit()
+        build_indexes(UNDIRECTED_INDEXES, workers)
+
+        print("Refreshing node degrees...")
+        cur.execute("""
+            TRUNCATE node_degrees;
+            INSERT INTO node_degrees (node_id, node_label, degree)
+            SELECT n.node_id, n.node_label, COALESCE(o.cnt, 0) + COALESCE(i.cnt, 0)
+            FROM nodes n
+            LEFT JOIN (SELECT node1_id, COUNT(DISTINCT node2_id) AS cnt FROM edges GROUP BY node1_id) o
+                ON o.node1_id = n.node_id
+            LEFT JOIN (SELECT node2_id, COUNT(DISTINCT node1_id) AS cnt FROM edges GROUP BY node2_id) i
+                ON i.node2_id = n.node_id;
+        """)
+        conn.commit()
+
+        print("Building outgoing relation sets...")
+        cur.execute("""
+            UPDATE nodes n SET out_rels = o.rels
+            FROM (
+                SELECT node1_id, jsonb_object_agg(relation, targets) AS rels
+                FROM (
+                    SELECT e.node1_id, r.relation, jsonb_agg(DISTINCT e.node2_id) AS targets
+                    FROM edges e
+                    JOIN relations r ON r.relation_id = e.relation_id
+                    WHERE r.relation IS NOT NULL
+                    GROUP BY e.node1_id, r.relation
+                ) t
+                GROUP BY node1_id
+            ) o
+            WHERE o.node1_id = n.node_id;
+            CREATE INDEX IF NOT EXISTS nodes_out_rels_gin ON nodes USING gin (out_rels jsonb_path_ops);
+        """)
+        conn.commit()
+
+def validate_constraints():
+    """Check the loaded edges against the foreign keys added as NOT VALID.
+    Each check takes a SHARE UPDATE EXCLUSIVE lock on edges, which leaves the tables readable
+    and writable but conflicts with itself, so the checks run one after another."""
+    print("Validating foreign keys...")
+    with psycopg.connect(**DB_PARAMS, autocommit=True) as conn:
+        for name in ("edges_node1_id_fkey", "edges_node2_id_fkey", "edges_relation_id_fkey"):
+            conn.execute(f"ALTER TABLE edges VALIDATE CONSTRAINT {name}")
+
+def import_data(tsv_path, batch_size=50000, clean=False, workers=1):
     """Improved data import function"""
     # Statistics
     total_nodes = 0
     total_edges = 0
     skipped_lines = 0
+    existing_edges = 0
+    dropped = False
     
     try:
         # Database connection with timeout
-        conn = psycopg2.connect(
-            dbname="Projects2025",
-            user="postgres",
-            password="postgres",
-            host="localhost",
-            port="5432",
-            connect_timeout=10
-        )
-        conn.autocommit = False
+        conn = connect()
         cur = conn.cursor()
 
         # Database preparation
         if clean:
             print("Clearing existing data...")
-            cur.execute("TRUNCATE TABLE edges, nodes RESTART IDENTITY CASCADE")
+            cur.execute("TRUNCATE TABLE edges, nodes, relations RESTART IDENTITY CASCADE")
             conn.commit()
+        # Shared by all workers, so a regular (unlogged) table rather than a temporary one.
+        # A failed import leaves it behind with the nodes of its committed edges, which are kept
+        # for the merge unless the data was just cleared
+        cur.execute("CREATE UNLOGGED TABLE IF NOT EXISTS nodes_stage (node_id TEXT, node_label TEXT, seen_at BIGINT)")
+        if clean:
+            cur.execute("TRUNCATE nodes_stage")
+        conn.commit()
 
         # Temporary removal of indexes and constraints for performance
         print("Optimizing table structure...")
         cur.execute("""
             ALTER TABLE edges DROP CONSTRAINT IF EXISTS edges_node1_id_fkey;
             ALTER TABLE edges DROP CONSTRAINT IF EXISTS edges_node2_id_fkey;
-            DROP INDEX IF EXISTS node1_idx, node2_idx, node_idx;
+            ALTER TABLE edges DROP CONSTRAINT IF EXISTS edges_relation_id_fkey;
+            DROP INDEX IF EXISTS node1_idx, node2_idx, node_idx,
+                nodes_out_rels_gin, edges_undirected_src_rel, edges_undirected_edge;
+            ALTER TABLE edges DISABLE TRIGGER edges_undirected_sync;
         """)
         conn.commit()
+        dropped = True
 
         # Data import
-        print(f"Starting import from file: {tsv_path}")
-        total_lines = count_lines(tsv_path) - 1  # Skip header
-        edge_id = 0
-        nodes_cache = set()
-        nodes_batch = []
-        edges_batch = []
-
-        with open(tsv_path, 'r', encoding='utf-8') as f, \
-             tqdm(total=total_lines, desc="Importing data") as pbar:
-
-            header = f.readline()  # Skip header
-
-            for line in f:
-                try:
-                    fields = line.strip().split('\t')
-                    if len(fields) < 7:  # Minimum required number of fields
-                        skipped_lines += 1
-                        continue
-
-                    node1_id, node1_label = fields[1], fields[4]
-                    node2_id, node2_label = fields[3], fields[5]
-                    relation, relation_label = fields[2], fields[6]
-
-                    # Adding nodes
-                    if node1_id not in nodes_cache:
-                        nodes_batch.append((node1_id, node1_label))
-                        nodes_cache.add(node1_id)
-                        total_nodes += 1
-                        
-                    if node2_id not in nodes_cache:
-                        nodes_batch.append((node2_id, node2_label))
-                        nodes_cache.add(node2_id)
-                        total_nodes += 1
-
-                    # Adding edges
-                    edges_batch.append((edge_id, node1_id, node2_id, relation, relation_label))
-                    edge_id += 1
-                    total_edges += 1
-
-                    # Execute batch
-                    if len(edges_batch) >= batch_size:
-                        execute_batches(cur, nodes_batch, edges_batch)
-                        conn.commit()
-                        nodes_batch = []
-                        edges_batch = []
-                        # Don't clear node cache to avoid duplicates
-
-                    pbar.update(1)
-
-                except Exception as e:
-                    print(f"Error in line: {line[:100]}... | {str(e)}")
-                    skipped_lines += 1
-
-            # Final batch
-            if edges_batch:
-                execute_batches(cur, nodes_batch, edges_batch)
-                conn.commit()
+        print(f"Starting import from file: {tsv_path} ({workers} worker(s))")
+        size = os.path.getsize(tsv_path)
+        shard_count = max(workers, -(-size // SHARD_SIZE))
+        ranges = shard_ranges(tsv_path, shard_count)
+        shards = [(tsv_path, start, end, batch_size, clean) for start, end in ranges]
+
+        with tqdm(total=sum(end - start for start, end in ranges), desc="Importing data", unit="B", unit_scale=True,
+                  mininterval=1.0, smoothing=0) as pbar, \
+             (multiprocessing.Pool(workers) if workers > 1 else nullcontext()) as pool:
+
+            # Each shard is loaded over its own connection; progress advances as shards finish
+            results = pool.imap_unordered(import_shard, shards) if pool else map(import_shard, shards)
+            for done, edges, skipped, existing in results:
+                pbar.update(done)
+                total_edges += edges
+                skipped_lines += skipped
+                existing_edges += existing
+
+        total_nodes = merge_nodes(cur)
+        conn.commit()
 
     except Exception as e:
         print(f"Critical import error: {str(e)}")
         if 'conn' in locals():
             conn.rollback()
+        if dropped:
+            print("Indexes and constraints were left dropped. Run with --restore to keep the ranges that "
+                  "finished, re-run the same file without --clean to load the rest, or re-run with --clean")
         raise
     finally:
-        # Restore database structure
-        if 'cur' in locals() and 'conn' in locals():
-            print("Restoring indexes and constraints...")
-            try:
-                cur.execute("""
-                    CREATE INDEX IF NOT EXISTS node1_idx ON edges (node1_id);
-                    CREATE INDEX IF NOT EXISTS node2_idx ON edges (node2_id);
-                    CREATE INDEX IF NOT EXISTS node_idx ON nodes (node_id);
-                    ALTER TABLE edges ADD CONSTRAINT edges_node1_id_fkey 
-                        FOREIGN KEY (node1_id) REFERENCES nodes (node_id);
-                    ALTER TABLE edges ADD CONSTRAINT edges_node2_id_fkey 
-                        FOREIGN KEY (node2_id) REFERENCES nodes (node_id);
-                """)
-                conn.commit()
-                cur.close()
-                conn.close()
-            except Exception as e:
-                print(f"Error during structure restoration: {str(e)}")
+        if 'conn' in locals():
+            conn.close()
+
+    # Only a complete load is indexed and constrained
+    restore_schema(workers)
 
     # Summary
     print("\nImport summary:")
     print(f"Imported nodes: {total_nodes}")
     print(f"Imported edges: {total_edges}")
     print(f"Skipped lines: {skipped_lines}")
+    if existing_edges:
+        print(f"Edges left out, edge_id already present: {existing_edges}")
 
 if __name__ == "__main__":
     start = time.time()
     parser = argparse.ArgumentParser(description='Import CSKG data to PostgreSQL')
-    parser.add_argument("--tsv", required=True, help="C:\\Users\\szymo\\pythonDatabase\\cskg.tsv")
-    parser.add_argument("--clean", action="store_true", help="Clear old data before import")
+    parser.add_argument("--tsv", help="C:\\Users\\szymo\\pythonDatabase\\cskg.tsv")
+    parser.add_argument("--clean", action="store_true",
+                        help="Clear old data before import. Needed when loading a different or edited file: "
+                             "edge ids are line offsets, so without it lines at already used offsets are left out")
     parser.add_argument("--batch", type=int, default=50000, help="Batch size")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Parallel worker processes, each loading part of the file over its own connection")
+    parser.add_argument("--restore", action="store_true",
+                        help="Only re-create the indexes, constraints and derived data, e.g. after a failed import")
+    parser.add_argument("--validate", action="store_true",
+                        help="Only check existing edges against the foreign keys, which imports add unchecked")
     args = parser.parse_args()
+    if not args.tsv and not args.restore and not args.validate:
+        parser.error("--tsv is required unless --restore or --validate is given")
     
     try:
-        import_data(
-            args.tsv, 
-            batch_size=args.batch,
-            clean=args.clean
-        )
+        if args.restore or args.validate:
+            if args.restore:
+                restore_schema(max(args.workers, 1))
+            if args.validate:
+                validate_constraints()
+        else:
+            import_data(
+                args.tsv, 
+                batch_size=args.batch,
+                clean=args.clean,
+                workers=max(args.workers, 1)
+            )
     except Exception as e:
         print(f"Import failed: {str(e)}")
         sys.exit(1)